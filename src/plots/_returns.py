@@ -0,0 +1,136 @@
+"""
+Shared yearly-return computation for the MSCI World plot scripts.
+
+Loads the daily CSV once, derives calendar-year returns, and builds the
+(start year x holding period) matrices of annualized and total returns via a
+single cumulative-log pass. The matrices are cached on disk keyed on the CSV's
+modification time, so every script after the first run skips both the CSV
+parse and the compute phase entirely.
+"""
+
+from functools import lru_cache
+from hashlib import md5
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = Path.cwd() / "src" / "data" / "cache"
+
+
+def load_prices(csv_path: Path) -> pd.Series:
+    """Parse the daily CSV and return the Close series indexed by date.
+
+    Only the Date and Close columns are read, through the multithreaded
+    Arrow parser; the header line plus the two metadata rows below it are
+    skipped, so column names are supplied explicitly. A Parquet mirror of
+    the parsed result is kept in the cache directory and reused while it is
+    at least as new as the CSV, so only the first run after a data update
+    pays the text-parsing cost.
+    """
+    mirror = CACHE_DIR / f"{csv_path.stem}.parquet"
+    if mirror.exists() and mirror.stat().st_mtime >= csv_path.stat().st_mtime:
+        return pd.read_parquet(mirror)["Close"]
+
+    df = pd.read_csv(
+        csv_path,
+        sep=",",
+        skiprows=3,
+        header=None,
+        names=["Date", "Close"],
+        usecols=[0, 1],
+        dtype={"Close": "float64"},
+        engine="pyarrow",
+    )
+    close = pd.Series(
+        df["Close"].to_numpy(),
+        index=pd.DatetimeIndex(pd.to_datetime(df["Date"]), name="Date"),
+        name="Close",
+    )
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    close.to_frame().to_parquet(mirror, engine="pyarrow")
+    return close
+
+
+def yearly_close(csv_path: Path) -> pd.Series:
+    """Return the last Close of each calendar year.
+
+    The ~50-row result is cached as a feather file keyed on the CSV's
+    modification time, so reruns skip the daily parse and resample entirely.
+    """
+    cache_file = CACHE_DIR / "yearly_close.feather"
+    if cache_file.exists() and cache_file.stat().st_mtime >= csv_path.stat().st_mtime:
+        return pd.read_feather(cache_file).set_index("Date")["Close"]
+
+    last = load_prices(csv_path).resample("YE").last()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    last.reset_index().to_feather(cache_file)
+    return last
+
+
+@lru_cache(maxsize=4)
+def _yearly_returns(csv_path: Path, mtime: float) -> pd.Series:
+    returns = yearly_close(csv_path).pct_change().dropna()
+    returns.index = returns.index.year
+    return returns[returns.index < 2025]
+
+
+def load_yearly_returns(csv_path: Path) -> pd.Series:
+    """Return the yearly Close-to-Close returns, indexed by calendar year.
+
+    Memoized per CSV modification time, so scripts sharing one process
+    (e.g. a driver that builds several plots) compute the series only once.
+    A copy is handed out to keep the cached frame immutable.
+    """
+    return _yearly_returns(csv_path, csv_path.stat().st_mtime).copy()
+
+
+def get_annualized_matrix(csv_path: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return (years, z_avg, z_tot) for the daily MSCI CSV at `csv_path`.
+
+    `z_avg[i, h]` is the annualized (geometric mean) return and `z_tot[i, h]`
+    the total cumulative return of an investment starting in `years[i]` and
+    held for `h + 1` years; entries running past the last year are NaN.
+    Results are cached as a compressed .npz keyed on the CSV mtime.
+    """
+    stamp = int(csv_path.stat().st_mtime)
+    key = md5(str(csv_path).encode()).hexdigest()[:8]
+    cache_file = CACHE_DIR / f"annualized_{stamp}_{key}.npz"
+    if cache_file.exists():
+        cached = np.load(cache_file)
+        return cached["years"], cached["z_avg"], cached["z_tot"]
+
+    returns = load_yearly_returns(csv_path)
+    years = returns.index.to_numpy()
+    n_years = len(years)
+
+    # Cumulative log growth turns every (start year, holding period) product
+    # into a single subtraction: logc[i + w] - logc[i] is the summed log
+    # return of the w-year window starting at row i. One broadcast
+    # subtraction then yields the whole upper-triangular matrix at once.
+    one_plus = returns.to_numpy() + 1
+    logc = np.concatenate(([0.0], np.cumsum(np.log(one_plus))))
+    cumprod = np.concatenate(([1.0], np.cumprod(one_plus)))
+
+    starts = np.arange(n_years)
+    windows = np.arange(1, n_years + 1)
+    ends = starts[:, None] + windows[None, :]
+    valid = ends <= n_years
+    end_idx = np.minimum(ends, n_years)
+
+    log_growth = np.where(valid, logc[end_idx] - logc[starts[:, None]], np.nan)
+    # Annualize and expm1 in place: log_growth is not needed afterwards, so
+    # it doubles as the z_avg output buffer instead of two fresh temporaries.
+    z_avg = np.divide(log_growth, windows, out=log_growth)
+    np.expm1(z_avg, out=z_avg)
+
+    # The total return needs no fractional power, so gather it straight from
+    # the cumulative product: exact, without the log/exp round-trip.
+    z_tot = np.divide(cumprod[end_idx], cumprod[starts[:, None]])
+    np.subtract(z_tot, 1.0, out=z_tot)
+    z_tot[~valid] = np.nan
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(cache_file, years=years, z_avg=z_avg, z_tot=z_tot)
+    return years, z_avg, z_tot
@@ -0,0 +1,51 @@
+"""
+Build every plot HTML in parallel.
+
+The plot scripts are independent of each other (shared inputs come from the
+disk caches in src/data/cache), so they are rendered in separate processes
+via a ProcessPoolExecutor. Run from the repository root:
+
+    python src/plots/build_all.py
+"""
+
+import runpy
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+PLOTS_DIR = Path(__file__).resolve().parent
+
+SCRIPTS = (
+    "plot_heatmap.py",
+    "plot_long-term.py",
+    "plot_multiple.py",
+    "plot_returns-one.py",
+    "plot_returns-two.py",
+    "plot_single.py",
+)
+
+
+def _run(script: str) -> str:
+    """Execute one plot script as __main__ in this worker process."""
+    sys.path.insert(0, str(PLOTS_DIR))
+    runpy.run_path(str(PLOTS_DIR / script), run_name="__main__")
+    return script
+
+
+def main() -> None:
+    # Warm the shared caches once, so the workers all hit the fast path
+    # instead of racing to parse the CSV in parallel.
+    sys.path.insert(0, str(PLOTS_DIR))
+    from _returns import get_annualized_matrix, load_yearly_returns
+
+    csv_path = Path.cwd() / "src" / "data" / "raw" / "MSCI_World_daily.csv"
+    load_yearly_returns(csv_path)
+    get_annualized_matrix(csv_path)
+
+    with ProcessPoolExecutor(max_workers=len(SCRIPTS)) as pool:
+        for script in pool.map(_run, SCRIPTS):
+            print(f"built {script}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 from pathlib import Path
 
 import numpy as np
-import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
+from _returns import get_annualized_matrix
+
+# Serialize figures with orjson (Rust, SIMD float paths) instead of stdlib json
+pio.json.config.default_engine = "orjson"
 
 # --- 1) Define color scales (renamed for clarity) ---
 COLOR_LIST = [
@@ -16,71 +20,70 @@ COLOR_LIST = [
     "#124C4C",
 ]
 
+
+def _hex_to_rgb(color: str) -> tuple[int, ...]:
+    return tuple(int(color[i : i + 2], 16) for i in (1, 3, 5))
+
+
+def build_lut_colorscale(positions, colors, n=256):
+    """
+    Discretize an anchor colorscale into an n-stop lookup table.
+
+    The interpolation between the 8 anchor colors happens once here in NumPy
+    instead of per cell and per redraw in the browser.
+    """
+    grid = np.linspace(0.0, 1.0, n)
+    channels = np.stack(
+        [
+            np.interp(grid, positions, channel)
+            for channel in zip(*(_hex_to_rgb(c) for c in colors))
+        ],
+        axis=1,
+    )
+    return [
+        (float(p), f"rgb({r},{g},{b})")
+        for p, (r, g, b) in zip(grid, channels.round().astype(int))
+    ]
+
+
 # Linear interpolation for average returns
 positions_avg = np.linspace(0, 1, len(COLOR_LIST))
-COLORSCALE_AVG = list(zip(positions_avg, COLOR_LIST))
+COLORSCALE_AVG = build_lut_colorscale(positions_avg, COLOR_LIST)
 
 # Exponential interpolation for total returns
 positions_tot = np.geomspace(1, 100, len(COLOR_LIST))
 positions_tot = (positions_tot - positions_tot.min()) / (
     positions_tot.max() - positions_tot.min()
 )
-COLORSCALE_TOT = list(zip(positions_tot, COLOR_LIST))
+COLORSCALE_TOT = build_lut_colorscale(positions_tot, COLOR_LIST)
 
 # --- 2) Load & prepare data ---
 WORKING_DIR = Path.cwd()
 FILE_PATH = WORKING_DIR / "src" / "data" / "raw" / "MSCI_World_daily.csv"
 SAVE_HTML_TO = WORKING_DIR / "img" / "heatmap.html"
 
-df = pd.read_csv(
-    FILE_PATH, sep=",", skiprows=[1, 2], header=0, index_col=0, parse_dates=True
-).rename_axis("Date")
-
-last = df.resample("YE").last()
-returns = last["Close"].pct_change().dropna().to_frame("Return")
-returns.index = returns.index.year
-returns = returns[returns.index < 2025]
+years, z_avg_matrix, z_tot_matrix = get_annualized_matrix(FILE_PATH)
 
 # Number of holding periods possible
-N_YEARS = returns.index.max() - returns.index.min() + 1
-
-# --- 3) Compute average (annualized) & total returns ---
-returns_avg = returns.copy()
-returns_tot = returns.copy()
-one_plus = returns["Return"] + 1
-
-for h in range(N_YEARS):
-    window = h + 1
-    # Annualized (geometric mean)
-    returns_avg[f"Return_{h}"] = (
-        one_plus.rolling(window=window, min_periods=window)
-        .apply(lambda x: x.prod() ** (1 / window), raw=True)
-        .shift(-h)
-        .sub(1)
-    )
-    # Total cumulative return
-    returns_tot[f"Return_{h}"] = (
-        one_plus.rolling(window=window, min_periods=window)
-        .apply(lambda x: x.prod(), raw=True)
-        .shift(-h)
-        .sub(1)
-    )
+N_YEARS = len(years)
 
-# --- 4) Build axes & text matrices ---
-holding_cols = [c for c in returns_avg.columns if c.startswith("Return_")]
-x_years = [int(c.split("_")[1]) + 1 for c in holding_cols]
-y_years = returns_avg.index.tolist()[::-1]  # newest at top
+# --- 3) Build axes & z matrices ---
+x_years = np.arange(1, N_YEARS + 1)
+y_years = years[::-1]  # newest at top
 
-# Z and text for average returns
-z_avg = returns_avg[holding_cols].values[::-1, :]
-text_avg = np.where(np.isnan(z_avg), "", (z_avg * 100).round(1).astype(str) + "%")
+# Newest year at top; rounded float32 halves the serialized payload, and the
+# cell labels are rendered client-side via texttemplate instead of shipping a
+# second N x N string matrix.
+z_avg = np.round(z_avg_matrix[::-1, :], 4).astype(np.float32)
+z_tot = np.round(z_tot_matrix[::-1, :], 4).astype(np.float32)
 
-# Z and text for total returns
-z_tot = returns_tot[holding_cols].values[::-1, :]
-text_tot = np.where(np.isnan(z_tot), "", (z_tot * 100).round(1).astype(str) + "%")
+# --- 4) Create heatmap trace ---
+# One trace only; the mode buttons restyle z/colorscale/limits in place, so
+# the browser never instantiates a second hidden heatmap.
+hover_avg = "Year %{y}<br>Holding %{x} yr<br>Avg Return %{z:.2%}<extra></extra>"
+hover_tot = "Year %{y}<br>Holding %{x} yr<br>Total Return %{z:.2%}<extra></extra>"
 
-# --- 5) Create heatmap traces ---
-trace_avg = go.Heatmap(
+trace = go.Heatmap(
     z=z_avg,
     x=x_years,
     y=y_years,
@@ -88,29 +91,14 @@ trace_avg = go.Heatmap(
     zmin=np.nanmin(z_avg),
     zmax=np.nanmax(z_avg),
     zmid=0,
-    text=text_avg,
-    texttemplate="%{text}",
-    hovertemplate="Year %{y}<br>Holding %{x} yr<br>Avg Return %{z:.2%}<extra></extra>",
-    visible=True,
-    showscale=False,
-)
-trace_tot = go.Heatmap(
-    z=z_tot,
-    x=x_years,
-    y=y_years,
-    colorscale=COLORSCALE_TOT,
-    zmin=np.nanmin(z_tot),
-    zmax=np.nanmax(z_tot),
-    zmid=0,
-    text=text_tot,
-    texttemplate="%{text}",
-    hovertemplate="Year %{y}<br>Holding %{x} yr<br>Total Return %{z:.2%}<extra></extra>",
-    visible=False,
+    texttemplate="%{z:.1%}",
+    hovertemplate=hover_avg,
+    zsmooth=False,
     showscale=False,
 )
 
-# --- 6) Figure with updatemenus ---
-fig = go.Figure(data=[trace_avg, trace_tot])
+# --- 5) Figure with updatemenus ---
+fig = go.Figure(data=[trace])
 
 (
     fig.update_layout(
@@ -128,16 +116,28 @@ fig = go.Figure(data=[trace_avg, trace_tot])
                 buttons=[
                     dict(
                         label="Average Return",
-                        method="update",
+                        method="restyle",
                         args=[
-                            {"visible": [True, False]},
+                            {
+                                "z": [z_avg],
+                                "colorscale": [COLORSCALE_AVG],
+                                "zmin": [float(np.nanmin(z_avg))],
+                                "zmax": [float(np.nanmax(z_avg))],
+                                "hovertemplate": [hover_avg],
+                            },
                         ],
                     ),
                     dict(
                         label="Total Return",
-                        method="update",
+                        method="restyle",
                         args=[
-                            {"visible": [False, True]},
+                            {
+                                "z": [z_tot],
+                                "colorscale": [COLORSCALE_TOT],
+                                "zmin": [float(np.nanmin(z_tot))],
+                                "zmax": [float(np.nanmax(z_tot))],
+                                "hovertemplate": [hover_tot],
+                            },
                         ],
                     ),
                 ],
@@ -186,9 +186,10 @@ fig.add_annotation(
     align="right",
 )
 
-# Export to HTML
-fig.write_html(
-    SAVE_HTML_TO,
+# Export to HTML (plotly.js from CDN instead of the ~3 MB inline bundle)
+html = pio.to_html(
+    fig,
+    include_plotlyjs="cdn",
     config={
         "displayModeBar": True,  # set to False to hide the toolbar completely
         # "modeBarButtonsToRemove": ["select2d", "lasso2d"],  # remove selection tools
@@ -197,3 +198,4 @@ fig.write_html(
         "displaylogo": False,  # hide the Plotly logo
     },
 )
+SAVE_HTML_TO.write_text(html, encoding="utf-8")
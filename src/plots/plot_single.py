@@ -6,14 +6,18 @@ and renders an interactive Plotly chart with additive and multiplicative modes.
 Author: Alexander Blinn
 """
 
-import locale
 from pathlib import Path
 
-import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
+from _returns import load_prices
 
-# --- Locale & Style Settings ---------------------------------------------
-locale.setlocale(locale.LC_TIME, "us_US.UTF-8")  # Ensure US month names
+# --- Style Settings -------------------------------------------------------
+# WebGL pays off here (~2800 points per trace), but every WebGL figure costs
+# one GL context and browsers cap those at ~16 per tab. If several plots end
+# up embedded on one page, keep WebGL for the dense line charts only and
+# leave small bar/scatter figures on SVG — or flip this off.
+USE_WEBGL = True
 
 LINE_COLOR = "#000000"  # Default line color
 LINE_WIDTH = 4  # Default line width
@@ -24,30 +28,12 @@ WORKING_DIR = Path.cwd()
 DATA_PATH = WORKING_DIR / "src" / "data" / "raw" / "MSCI_World_daily.csv"
 SAVE_HTML_TO = WORKING_DIR / "img" / "single.html"
 
-# --- Data Loading & Preparation ------------------------------------------
-try:
-    # Skip first two metadata rows, parse dates, set index
-    df = pd.read_csv(
-        DATA_PATH, sep=",", skiprows=[1, 2], header=0, index_col=0, parse_dates=True
-    )
-except FileNotFoundError:
-    raise FileNotFoundError(f"Data file not found: {DATA_PATH}")
-
-# Rename index for clarity and select first column only
-df = df.rename_axis("Date")
-if df.shape[1] > 1:
-    df = df.iloc[:, [0]]
-df.columns = ["Value"]
-
-# Resample weekly and take the first value of each week
-df = df.resample("W").first()
-
 # Y-axis limits for consistency
 ymin, ymax = 0, 4400
 
 
 # --- Plotting Function ---------------------------------------------------
-def main(df: pd.DataFrame):
+def build() -> None:
     """
     Renders an interactive Plotly chart with two modes:
       1. Additive Change
@@ -55,15 +41,26 @@ def main(df: pd.DataFrame):
 
     Mode toggles via buttons above the chart.
     """
-    fig = go.Figure()
+    # --- Data Loading & Preparation --------------------------------------
+    try:
+        # Shared Arrow-backed loader: only Date and Close are parsed
+        df = load_prices(DATA_PATH).to_frame("Value")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Data file not found: {DATA_PATH}")
+
+    # Resample weekly and take the first value of each week
+    df = df.resample("W").first()
 
     # Add two traces: additive and multiplicative
+    scatter_cls = go.Scattergl if USE_WEBGL else go.Scatter
+    traces = []
     for mode, col, visible in [
         ("Additive Change", "Value", True),
         ("Multiplicative Change", "Value", False),
     ]:
-        fig.add_trace(
-            go.Scatter(
+        traces.append(
+            # WebGL: ~2800 Punkte pro Trace landen im Canvas statt als DOM-Knoten
+            scatter_cls(
                 x=df.index,
                 y=df[col],
                 mode="lines",
@@ -124,8 +121,8 @@ def main(df: pd.DataFrame):
         ),
     ]
 
-    # Apply layout with buttons
-    fig.update_layout(
+    # Build the full layout up front; the Figure constructor validates once
+    layout = go.Layout(
         updatemenus=[
             dict(
                 type="buttons",
@@ -162,31 +159,37 @@ def main(df: pd.DataFrame):
         plot_bgcolor="rgba(0,0,0,0)",
         paper_bgcolor="rgba(0,0,0,0)",
         title="MSCI World Index: Weekly Profile",
+        # Annotation with data source and author
+        annotations=[
+            dict(
+                xref="paper",
+                yref="paper",
+                x=1,
+                y=1,
+                xanchor="right",
+                yanchor="top",
+                text=(
+                    "Weekly closing values of the MSCI World Index, "
+                    "sampled weekly.<br>"
+                    "Additive trace shows raw index values; Multiplicative uses "
+                    "log₂ transformation. "
+                    "Switch modes with the buttons above.<br>"
+                    "Data source: Yahoo Finance (^990100-USD-STRD). "
+                    "Author: Alexander Blinn"
+                ),
+                showarrow=False,
+                font=dict(size=8, color="black"),
+                align="right",
+            )
+        ],
     )
 
-    # Add annotation with data source and author
-    fig.add_annotation(
-        xref="paper",
-        yref="paper",
-        x=1,
-        y=1,
-        xanchor="right",
-        yanchor="top",
-        text=(
-            "Weekly closing values of the MSCI World Index, sampled weekly.<br>"
-            "Additive trace shows raw index values; Multiplicative uses log₂ transformation. "
-            "Switch modes with the buttons above.<br>"
-            "Data source: Yahoo Finance (^990100-USD-STRD). "
-            "Author: Alexander Blinn"
-        ),
-        showarrow=False,
-        font=dict(size=8, color="black"),
-        align="right",
-    )
+    fig = go.Figure(data=traces, layout=layout)
 
     # Export to HTML
-    fig.write_html(
-        SAVE_HTML_TO,
+    html = pio.to_html(
+        fig,
+        include_plotlyjs="cdn",  # Plotly.js vom CDN statt ~3.5 MB Bundle pro Datei
         config={
             "displayModeBar": True,  # set to False to hide the toolbar completely
             "modeBarButtonsToRemove": ["select2d", "lasso2d"],  # remove selection tools
@@ -195,7 +198,8 @@ def main(df: pd.DataFrame):
             "displaylogo": False,  # hide the Plotly logo
         },
     )
+    SAVE_HTML_TO.write_text(html, encoding="utf-8")
 
 
 if __name__ == "__main__":
-    main(df)
+    build()